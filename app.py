@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import pyarrow as pa
 import plotly.express as px
+import plotly.graph_objects as go
 
 
 # --------------------
@@ -18,17 +20,57 @@ st.set_page_config(
 # --------------------
 # Load data
 # --------------------
+# Only the columns the dashboard reads. "country" is always "USA",
+# sqft_above/sqft_basement add up to sqft_living, and waterfront/view are
+# almost always 0.
+USECOLS = [
+    "date", "price", "bedrooms", "bathrooms", "sqft_living", "sqft_lot",
+    "floors", "condition", "yr_built", "yr_renovated", "street", "city",
+    "statezip",
+]
+
+
 @st.cache_data
 def load_data():
-    df = pd.read_csv("USA Housing Dataset.csv")
+    # Low-cardinality strings as categoricals keep filters/groupbys on int codes
+    df = pd.read_csv(
+        "USA Housing Dataset.csv",
+        engine="pyarrow",
+        usecols=USECOLS,
+        dtype={
+            "city": "category",
+            "statezip": "category",
+        },
+    )
+    # Narrower numeric dtypes halve the bytes every scan/groupby touches;
+    # to_numeric only downcasts when no values change
+    df["price"] = pd.to_numeric(df["price"], downcast="float")
+    df["bathrooms"] = pd.to_numeric(df["bathrooms"], downcast="float")
+    df["sqft_living"] = pd.to_numeric(df["sqft_living"], downcast="integer")
+    # bedrooms is parsed as float (3.0) but has no NaNs, so plain int8 is safe
+    df["bedrooms"] = df["bedrooms"].astype("int8")
+
     if "date" in df.columns:
         df["date"] = pd.to_datetime(df["date"])
         df["year"] = df["date"].dt.year
-        df["month"] = df["date"].dt.to_period("M").dt.to_timestamp()
-    return df
+
+    # Widget inputs don't depend on the filters, so build them once here
+    meta = {
+        "price_min": int(df["price"].min()),
+        "price_max": int(df["price"].max()),
+        "bedrooms": sorted(df["bedrooms"].dropna().astype(int).unique().tolist()),
+        "bathrooms": sorted(df["bathrooms"].dropna().astype(int).unique().tolist()),
+        "cities": sorted(df["city"].dropna().unique().tolist()),
+        "states": sorted(df["statezip"].dropna().unique().tolist()),
+        "years": (
+            sorted(df["year"].dropna().astype(int).unique().tolist())
+            if "year" in df.columns else None
+        ),
+    }
+    return df, meta
 
 
-df = load_data()
+df, meta = load_data()
 
 
 # --------------------
@@ -42,8 +84,10 @@ SIDEBAR_BG = "rgba(0, 0, 0, 0.75)"
 # --------------------
 # Background + UI CSS
 # --------------------
-st.markdown(
-    f"""
+# Built once per process; reruns only re-send the cached string
+@st.cache_resource
+def get_css():
+    return f"""
     <style>
     .stApp {{
         background-image: url("https://images.unsplash.com/photo-1568605114967-8130f3a36994");
@@ -77,9 +121,10 @@ st.markdown(
         background-color: rgba(0,0,0,0.7);
     }}
     </style>
-    """,
-    unsafe_allow_html=True
-)
+    """
+
+
+st.markdown(get_css(), unsafe_allow_html=True)
 
 
 # --------------------
@@ -91,7 +136,7 @@ st.sidebar.markdown(
 )
 
 
-price_min, price_max = int(df["price"].min()), int(df["price"].max())
+price_min, price_max = meta["price_min"], meta["price_max"]
 price_range = st.sidebar.slider(
     "Price range",
     min_value=price_min,
@@ -101,30 +146,30 @@ price_range = st.sidebar.slider(
 
 bedrooms_filter = st.sidebar.multiselect(
     "Bedrooms",
-    sorted(df["bedrooms"].dropna().astype(int).unique()),
+    meta["bedrooms"],
 )
 
 bathrooms_filter = st.sidebar.multiselect(
     "Bathrooms",
-    sorted(df["bathrooms"].dropna().astype(int).unique()),
+    meta["bathrooms"],
 )
 
 city_filter = st.sidebar.multiselect(
     "City",
-    sorted(df["city"].dropna().unique())
+    meta["cities"]
 )
 
 state_filter = st.sidebar.multiselect(
     "State / Zip",
-    sorted(df["statezip"].dropna().unique())
+    meta["states"]
 )
 
 
 # --------------------
 # SAFE Year filter (FIXED)
 # --------------------
-if "year" in df.columns:
-    years = sorted(df["year"].dropna().unique())
+if meta["years"]:
+    years = meta["years"]
 
     if len(years) > 1:
         year_range = st.sidebar.slider(
@@ -144,28 +189,93 @@ else:
 # --------------------
 # Apply filters
 # --------------------
-filtered_df = df[
-    (df["price"] >= price_range[0]) &
-    (df["price"] <= price_range[1])
-]
+# Not cached: a cache_data hit unpickles a full copy of the frame, which
+# costs more than just running the mask. The small aggregates below are
+# cached instead, keyed by the filter tuple; the price slider has a $1
+# step, so those caches are bounded.
+FILTER_CACHE_ENTRIES = 32
 
-if bedrooms_filter:
-    filtered_df = filtered_df[filtered_df["bedrooms"].isin(bedrooms_filter)]
 
-if bathrooms_filter:
-    filtered_df = filtered_df[filtered_df["bathrooms"].isin(bathrooms_filter)]
+def apply_filters(price_range, bedrooms, bathrooms, cities, states, year_range):
+    # One fused boolean mask and a single .loc, instead of slicing step by step
+    price = df["price"].to_numpy()
+    mask = (price >= price_range[0]) & (price <= price_range[1])
 
-if city_filter:
-    filtered_df = filtered_df[filtered_df["city"].isin(city_filter)]
+    if bedrooms:
+        mask &= np.isin(df["bedrooms"].to_numpy(), bedrooms)
 
-if state_filter:
-    filtered_df = filtered_df[filtered_df["statezip"].isin(state_filter)]
+    if bathrooms:
+        mask &= np.isin(df["bathrooms"].to_numpy(), bathrooms)
+
+    # Categoricals: map the selected labels to codes once, then compare codes
+    if cities:
+        mask &= np.isin(
+            df["city"].cat.codes.to_numpy(),
+            df["city"].cat.categories.get_indexer(list(cities)),
+        )
+
+    if states:
+        mask &= np.isin(
+            df["statezip"].cat.codes.to_numpy(),
+            df["statezip"].cat.categories.get_indexer(list(states)),
+        )
+
+    if year_range and "year" in df.columns:
+        year = df["year"].to_numpy()
+        mask &= (year >= year_range[0]) & (year <= year_range[1])
+
+    return df.loc[mask]
 
-if year_range and "year" in filtered_df.columns:
-    filtered_df = filtered_df[
-        (filtered_df["year"] >= year_range[0]) &
-        (filtered_df["year"] <= year_range[1])
-    ]
+
+filters = (
+    tuple(price_range),
+    tuple(bedrooms_filter),
+    tuple(bathrooms_filter),
+    tuple(city_filter),
+    tuple(state_filter),
+    tuple(year_range) if year_range else None,
+)
+filtered_df = apply_filters(*filters)
+
+
+# --------------------
+# Cached aggregates (keyed by the filter tuple)
+# --------------------
+# The leading underscore keeps Streamlit from hashing the frame; `filters`
+# is the cache key and always describes _filtered_df.
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+def compute_group_prices(filters, _filtered_df):
+    # One scan over price: per (city, bedrooms) sums and counts, then roll
+    # those up so both averages stay exact (not a mean of means)
+    agg = (
+        _filtered_df
+        .groupby(["city", "bedrooms"], observed=True)["price"]
+        .agg(["sum", "count"])
+    )
+
+    bed = agg.groupby(level="bedrooms").sum()
+    bed_price = (bed["sum"] / bed["count"]).rename("price").reset_index()
+
+    city = agg.groupby(level="city", observed=True).sum()
+    city_price = (
+        (city["sum"] / city["count"]).rename("price")
+        .nlargest(20)
+        .reset_index()
+    )
+    return bed_price, city_price
+
+
+# Only features that are meaningful to correlate
+CORR_COLS = [
+    "price", "sqft_living", "sqft_lot", "bedrooms", "bathrooms", "floors",
+    "yr_built",
+]
+
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+def compute_corr(filters, _filtered_df):
+    numeric_cols = _filtered_df[CORR_COLS]
+    return numeric_cols.corr().round(2)
 
 
 # --------------------
@@ -174,8 +284,9 @@ if year_range and "year" in filtered_df.columns:
 # st.title("🏙️ USA Housing Analytics Dashboard")
 # st.caption("Beautiful scenic visualization of housing trends across the United States")
 
-st.markdown(
-    """
+@st.cache_resource
+def get_hero_html():
+    return """
     <style>
     .hero-header {
         background-image: url(https://images.pexels.com/photos/258154/pexels-photo-258154.jpeg);
@@ -208,36 +319,41 @@ st.markdown(
             Beautiful scenic visualization of housing trends across the United States
         </div>
     </div>
-    """,
-    unsafe_allow_html=True
-)
+    """
+
+
+st.markdown(get_hero_html(), unsafe_allow_html=True)
 
 
 st.markdown("---")
 
 
+# Nothing matched: skip the KPIs/charts instead of running them on empty data
+if filtered_df.empty:
+    st.warning("No rows match the selected filters.")
+    st.stop()
+
+
 # --------------------
 # KPIs
 # --------------------
+kpis = filtered_df.agg({
+    "price": "mean",
+    "sqft_living": "median",
+    "bedrooms": "mean",
+    "bathrooms": "mean",
+})
+
 c1, c2, c3, c4 = st.columns(4)
 
-c1.metric(
-    "Average Price $",
-    int(filtered_df["price"].mean()) if not filtered_df.empty else "N/A"
-)
+c1.metric("Average Price $", int(kpis["price"]))
 
-c2.metric("Median Area in Sqft", f"{filtered_df['sqft_living'].median():,.0f}")
+c2.metric("Median Area in Sqft", f"{kpis['sqft_living']:,.0f}")
 
-c3.metric(
-    "Avg Bedrooms",
-    int(round(filtered_df["bedrooms"].mean())) if not filtered_df.empty else "N/A"
-)
+c3.metric("Avg Bedrooms", int(round(kpis["bedrooms"])))
 
 
-c4.metric(
-    "Avg Bathrooms",
-    int(round(filtered_df["bathrooms"].mean())) if not filtered_df.empty else "N/A"
-)
+c4.metric("Avg Bathrooms", int(round(kpis["bathrooms"])))
 
 
 
@@ -247,48 +363,79 @@ st.markdown("---")
 # --------------------
 # Charts
 # --------------------
+# Medium dark background with white fonts/grids, shared by the scatter and
+# bar charts; each chart only sets its own axis titles on top
+@st.cache_resource
+def dark_layout():
+    return dict(
+        plot_bgcolor="#424040",      # medium dark background inside plot
+        paper_bgcolor="#2C2C2C",     # medium dark background around plot
+        font_color="white",           # all text white
+        xaxis=dict(
+            showgrid=False,
+            gridcolor="white",
+            zeroline=False,
+            tickfont=dict(color="white")
+        ),
+        yaxis=dict(
+            showgrid=True,
+            gridcolor="white",
+            zeroline=False,
+            tickfont=dict(color="white")
+        ),
+        legend=dict(
+            title_font_color="white",
+            font=dict(color="white")
+        )
+    )
+
+
 st.subheader("📈 Price vs Living Area")
 
-fig_scatter = px.scatter(
-    filtered_df.sample(min(2000, len(filtered_df))),
-    x="sqft_living",
-    y="price",
-    color="bedrooms",
-    size="bathrooms",
-    hover_data=["city", "statezip"]
-)
+# Evenly spaced sample (no RNG/permutation), only the columns plotly needs
+n_rows = len(filtered_df)
+k = min(2000, n_rows)
+scatter_df = filtered_df.iloc[np.linspace(0, n_rows - 1, k, dtype=int)][
+    ["sqft_living", "price", "bedrooms", "bathrooms", "city", "statezip"]
+]
 
-# Update layout for medium dark background and white fonts/grids
-fig_scatter.update_layout(
-    plot_bgcolor="#424040",      # medium dark background inside plot
-    paper_bgcolor="#2C2C2C",     # medium dark background around plot
-    font_color="white",           # all text white
-    xaxis=dict(
-        showgrid=False,
-        gridcolor="white",
-        zeroline=False,
-        title="Living Area (sqft)",
-        tickfont=dict(color="white")
-    ),
-    yaxis=dict(
-        showgrid=True,
-        gridcolor="white",
-        zeroline=False,
-        title="Price ($)",
-        tickfont=dict(color="white")
-    ),
-    legend=dict(
-        title_font_color="white",
-        font=dict(color="white")
+# Plain Scattergl trace fed with NumPy arrays, skipping plotly.express'
+# pandas grouping/hover-frame layer
+fig_scatter = go.Figure(
+    go.Scattergl(
+        x=scatter_df["sqft_living"].to_numpy(),
+        y=scatter_df["price"].to_numpy(),
+        mode="markers",
+        marker=dict(
+            color=scatter_df["bedrooms"].to_numpy(),
+            size=scatter_df["bathrooms"].to_numpy() * 3,
+            colorscale="Turbo",
+            showscale=True,
+            colorbar=dict(title="bedrooms"),
+        ),
+        customdata=np.column_stack([
+            scatter_df["bathrooms"].to_numpy(),
+            scatter_df["city"].to_numpy(),
+            scatter_df["statezip"].to_numpy(),
+        ]),
+        hovertemplate=(
+            "sqft_living=%{x}<br>price=%{y}<br>bedrooms=%{marker.color}"
+            "<br>bathrooms=%{customdata[0]}<br>city=%{customdata[1]}"
+            "<br>statezip=%{customdata[2]}<extra></extra>"
+        ),
     )
 )
 
+fig_scatter.update_layout(**dark_layout())
+fig_scatter.update_xaxes(title="Living Area (sqft)")
+fig_scatter.update_yaxes(title="Price ($)")
+
 st.plotly_chart(fig_scatter, use_container_width=True)
 # ------------------------------------------------------------
 
 st.subheader("🛏️ Average Price by Bedrooms")
 
-bed_price = filtered_df.groupby("bedrooms")["price"].mean().reset_index()
+bed_price, city_price = compute_group_prices(filters, filtered_df)
 
 fig_bed = px.bar(
     bed_price,
@@ -297,41 +444,15 @@ fig_bed = px.bar(
     color="bedrooms",
 )
 
-# Update layout for medium dark background and white text/grid
-fig_bed.update_layout(
-    plot_bgcolor="#424040",      # medium dark inside plot
-    paper_bgcolor="#2C2C2C",     # medium dark around plot
-    font_color="white",           # all text white
-    xaxis=dict(
-        showgrid=False,
-        gridcolor="white",
-        zeroline=False,
-        title="Bedrooms",
-        tickfont=dict(color="white")
-    ),
-    yaxis=dict(
-        showgrid=True,
-        gridcolor="white",
-        zeroline=False,
-        title="Average Price ($)",
-        tickfont=dict(color="white")
-    ),
-    showlegend=False               # optional: hide legend
-)
+fig_bed.update_layout(**dark_layout(), showlegend=False)
+fig_bed.update_xaxes(title="Bedrooms")
+fig_bed.update_yaxes(title="Average Price ($)")
 
 st.plotly_chart(fig_bed, use_container_width=True)
 # ------------------------------------------------------------
 
 st.subheader("🗺️ Average Price by City (Top 20)")
 
-city_price = (
-    filtered_df.groupby("city")["price"]
-    .mean()
-    .reset_index()
-    .sort_values("price", ascending=False)
-    .head(20)
-)
-
 fig_city = px.bar(
     city_price,
     x="city",
@@ -340,28 +461,9 @@ fig_city = px.bar(
     color_continuous_scale="Turbo"
 )
 
-# Same styling as Bedrooms chart
-fig_city.update_layout(
-    plot_bgcolor="#424040",      # medium dark plot background
-    paper_bgcolor="#2C2C2C",     # medium dark outer background
-    font_color="white",
-    xaxis=dict(
-        showgrid=False,
-        gridcolor="white",
-        zeroline=False,
-        title="City",
-        tickfont=dict(color="white")
-    ),
-    yaxis=dict(
-        showgrid=True,
-        gridcolor="white",
-        zeroline=False,
-        title="Average Price ($)",
-        tickfont=dict(color="white")
-    )
-)
-
-fig_city.update_xaxes(tickangle=45)
+fig_city.update_layout(**dark_layout())
+fig_city.update_xaxes(title="City", tickangle=45)
+fig_city.update_yaxes(title="Average Price ($)")
 
 st.plotly_chart(fig_city, use_container_width=True)
 # ------------------------------------------------------------
@@ -371,56 +473,68 @@ st.plotly_chart(fig_city, use_container_width=True)
 # --------------------
 st.subheader("📊 Feature Correlation")
 
-numeric_cols = filtered_df.select_dtypes(include=np.number)
-
-if not numeric_cols.empty and len(numeric_cols.columns) > 1:
-    corr = numeric_cols.corr().round(2)
-
-    fig_corr = px.imshow(
-        corr,
-        text_auto=True,                 # show values like bars show labels
-        color_continuous_scale="Turbo", # same vibrant feel as city bar chart
-        zmin=-1,
-        zmax=1,
-        aspect="auto",
-        template="plotly_dark"
-    )
+corr = compute_corr(filters, filtered_df)
+
+# Per-cell text labels are one SVG node each, so only draw them while
+# the matrix is small
+cols = corr.columns.tolist()
+text_kwargs = {"text_auto": ".2f"} if len(cols) <= 10 else {}
+
+fig_corr = px.imshow(
+    corr.to_numpy(),                # raw z matrix, no DataFrame introspection
+    x=cols,
+    y=cols,
+    **text_kwargs,
+    color_continuous_scale="Turbo", # same vibrant feel as city bar chart
+    zmin=-1,
+    zmax=1,
+    aspect="auto",
+    template="plotly_dark"
+)
 
-    fig_corr.update_layout(
-        title=dict(
+fig_corr.update_layout(
+    title=dict(
         text="📊 Correlation Between Numeric Features",
         font=dict(color="white", size=20)
     ),
-        plot_bgcolor="#424040",      # medium dark plot background
-        paper_bgcolor="#2C2C2C",     # medium dark outer background
-        font_color="white",
-        coloraxis_colorbar=dict(
-            title="Correlation",
-            tickvals=[-1, -0.5, 0, 0.5, 1],
-            tickfont=dict(color="white")
-        )
-    )
-
-    fig_corr.update_xaxes(
-        tickangle=45,
-        side="bottom",
+    plot_bgcolor="#424040",      # medium dark plot background
+    paper_bgcolor="#2C2C2C",     # medium dark outer background
+    font_color="white",
+    coloraxis_colorbar=dict(
+        title="Correlation",
+        tickvals=[-1, -0.5, 0, 0.5, 1],
         tickfont=dict(color="white")
     )
+)
 
-    fig_corr.update_yaxes(
-        autorange="reversed",
-        tickfont=dict(color="white")
-    )
+fig_corr.update_xaxes(
+    tickangle=45,
+    side="bottom",
+    tickfont=dict(color="white")
+)
 
-    st.plotly_chart(fig_corr, use_container_width=True)
+fig_corr.update_yaxes(
+    autorange="reversed",
+    tickfont=dict(color="white")
+)
 
-else:
-    st.info("Not enough numeric data to compute correlation.")
+st.plotly_chart(fig_corr, use_container_width=True)
 # ------------------------------------------------------------
 
 # --------------------
 # Raw data
 # --------------------
+# Arrow tables are immutable, so one shared instance per filter selection
+# is safe; st.dataframe then skips the pandas -> Arrow conversion
+@st.cache_resource(max_entries=FILTER_CACHE_ENTRIES)
+def compute_raw_preview(filters, _filtered_df):
+    return pa.Table.from_pandas(
+        # Only the loaded columns; the derived year column repeats date
+        _filtered_df.head(200)[USECOLS],
+        preserve_index=False,
+    )
+
+
 with st.expander("🔍 Show filtered raw data"):
-    st.dataframe(filtered_df.head(200))
+    st.dataframe(compute_raw_preview(filters, filtered_df))
 